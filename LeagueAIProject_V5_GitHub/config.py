@@ -0,0 +1,121 @@
+import os
+import json
+
+# Project root; default data directories are created next to the code
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Config file path can be given on the command line or through this variable
+CONFIG_ENV_VAR = "LEAGUE_AI_CONFIG"
+
+# Any setting can be overridden with LEAGUE_AI_<NAME>, e.g. LEAGUE_AI_DATA_DIR
+ENV_PREFIX = "LEAGUE_AI_"
+
+DEFAULTS = {
+    # Base directories
+    "data_dir": os.path.join(PROJECT_DIR, "match_id_and_data"),
+    "ai_data_dir": os.path.join(PROJECT_DIR, "ai_data"),
+
+    # Paths derived from the base directories unless set explicitly
+    "raw_json_dir": "{data_dir}/shared_json_data",
+    "processed_csv_dir": "{data_dir}/processed_csv_data",
+    "processed_ids_log": "{data_dir}/logs/processed_ids.log",
+    "crawl_log": "{data_dir}/fetch_and_save.log",
+    "puuid_file": "{data_dir}/fetcher/fetcher/puuids.txt",
+    "used_puuid_file": "{data_dir}/fetcher/fetcher/used_puuids.txt",
+    "dead_letter_file": "{data_dir}/dead_letter_matches.jsonl",
+    "coordinator_db": "{data_dir}/coordinator.sqlite",
+    "raw_archive_dir": "{data_dir}/raw_archive",
+    "checkpoint_dir": "{data_dir}/checkpoints",
+    "match_data_dir": "{ai_data_dir}/match_data",
+    "aggregated_file": "{ai_data_dir}/aggregated_player_data.csv",
+    "ai_ready_file": "{ai_data_dir}/ai_ready_dataset.csv",
+
+    # Riot API
+    "api_key": "",
+    "api_base_url": "https://americas.api.riotgames.com/lol/match/v5/matches",
+
+    # Crawl tunables
+    "request_limit": 99,
+    "window_seconds": 120,
+    "retry_delay": 60,
+    "max_attempts": 5,
+    "dead_letter_expiry": 86400,  # Seconds before a match that ran out of attempts may be tried again
+    "match_count": 20,
+
+    # Field projection at ingest ("full", "training" or "minimal"; see data_processing/projection.py)
+    "projection_profile": "training",
+    "archive_raw": True,
+
+    # Multi-worker coordination ("sqlite" for workers sharing a disk, "tcp" for a coordinator server)
+    "coordinator_backend": "sqlite",
+    "coordinator_address": "127.0.0.1:50505",
+    "coordinator_authkey": "",
+    "lease_seconds": 300,
+    "worker_id": "",
+
+    # Crawl checkpoint journal is compacted after this many appended records
+    "checkpoint_compact_every": 200,
+}
+
+# Settings whose values are path templates filled in from the base directories
+PATH_TEMPLATE_KEYS = [key for key, value in DEFAULTS.items() if isinstance(value, str) and "{" in value]
+
+_config = None
+
+
+def _coerce(value, default):
+    """
+    Convert an environment string to the type of the default value.
+    """
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def load_config(path=None):
+    """
+    Build the settings from defaults, then the JSON config file, then the environment.
+    The result is cached and returned by get_config().
+    """
+    global _config
+    config = dict(DEFAULTS)
+
+    path = path or os.environ.get(CONFIG_ENV_VAR)
+    if path:
+        with open(path, "r") as file:
+            file_settings = json.load(file)
+        unknown = set(file_settings) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown settings in {path}: {', '.join(sorted(unknown))}")
+        config.update(file_settings)
+
+    for key, default in DEFAULTS.items():
+        env_value = os.environ.get(ENV_PREFIX + key.upper())
+        if env_value is not None:
+            config[key] = _coerce(env_value, default)
+
+    # The Riot tooling convention for the key is also accepted
+    if not config["api_key"]:
+        config["api_key"] = os.environ.get("RIOT_API_KEY", "")
+
+    # Fill in derived paths after all overrides so changing data_dir moves everything.
+    # Only path settings are templates; secrets and URLs are used exactly as given.
+    for key in PATH_TEMPLATE_KEYS:
+        if isinstance(config[key], str):
+            config[key] = os.path.normpath(config[key].format(**config))
+
+    _config = config
+    return config
+
+
+def get_config():
+    """
+    Return the cached settings, loading them on first use.
+    """
+    if _config is None:
+        return load_config()
+    return _config
@@ -1,60 +1,114 @@
 import os
 import pandas as pd
+from config import get_config
+from .match_index import MatchIndex, PLAYER_DATA_FILE
 
 
-def split_and_save_by_puuid(root_dir, output_dir):
+def split_and_save_by_puuid(root_dir, output_dir, puuids=None):
     """
-    Scan directories for Player_Data.csv, split data by puuid,
+    Look up Player_Data.csv locations in the match index, split data by puuid,
     and save each subset to a separate file.
+    Pass `puuids` to only export those players' rows.
     """
-    for subdir, dirs, files in os.walk(root_dir):
-        for file in files:
-            if file == 'Player_Data.csv':
-                file_path = os.path.join(subdir, file)
-                try:
-                    # Load the CSV file
-                    df = pd.read_csv(file_path)
-
-                    # Check for required columns
-                    required_columns = {'puuid', 'summonerName', 'matchId'}
-                    missing_columns = required_columns - set(df.columns)
-                    if missing_columns:
-                        print(f"\nFile: {file_path}")
-                        print(f"Missing columns: {', '.join(missing_columns)}")
-                        user_input = input("Do you want to skip this file? (yes/no): ").strip().lower()
-                        if user_input == 'yes':
-                            print("Skipping file...")
-                            continue
-                        elif user_input == 'no':
-                            print("Attempting to process the file anyway...")
-                        else:
-                            print("Invalid input. Skipping file by default...")
-                            continue
-
-                    # Group by puuid and process each group
-                    grouped = df.groupby('puuid')
-                    for puuid, group in grouped:
-                        summoner_name = group['summonerName'].iloc[0]
-                        match_id = group['matchId'].iloc[0]
-
-                        # Create a unique and clean file name
-                        file_name = f"{summoner_name}_{match_id}.csv".replace(" ", "_")
-                        output_path = os.path.join(output_dir, file_name)
-
-                        # Save the group data to the output path
-                        group.to_csv(output_path, index=False)
-                        print(f"Saved: {output_path}")
-
-                except Exception as e:
-                    print(f"Error processing file {file_path}: {e}")
-
-
-# Define input and output directories
-input_root_dir = "C:/Users/ssass/PycharmProjects/LeagueAIProject_V4/match_id_and_data/processed_csv_data"
-output_directory = "C:/Users/ssass/PycharmProjects/LeagueAIProject_V4/ai_data/match_data"
-
-# Ensure the output directory exists
-os.makedirs(output_directory, exist_ok=True)
-
-# Execute the function
-split_and_save_by_puuid(input_root_dir, output_directory)
+    with MatchIndex(root_dir) as index:
+        index.ensure_built()
+        if puuids is None:
+            puuids = index.all_puuids()
+        wanted = set(puuids)
+
+        # Read each match directory once, however many requested players it contains
+        match_dirs = {}
+        for rows in index.rows_for_puuids(wanted).values():
+            for match_id, match_dir, row_index in rows:
+                match_dirs[match_id] = match_dir
+
+    for match_id, match_dir in sorted(match_dirs.items()):
+        file_path = os.path.join(match_dir, PLAYER_DATA_FILE)
+        try:
+            # Load the CSV file
+            df = pd.read_csv(file_path)
+
+            # Check for required columns
+            required_columns = {'puuid', 'summonerName', 'matchId'}
+            missing_columns = required_columns - set(df.columns)
+            if missing_columns:
+                print(f"\nFile: {file_path}")
+                print(f"Missing columns: {', '.join(missing_columns)}")
+                user_input = input("Do you want to skip this file? (yes/no): ").strip().lower()
+                if user_input == 'yes':
+                    print("Skipping file...")
+                    continue
+                elif user_input == 'no':
+                    print("Attempting to process the file anyway...")
+                else:
+                    print("Invalid input. Skipping file by default...")
+                    continue
+
+            # Group by puuid and process each requested group
+            grouped = df[df['puuid'].isin(wanted)].groupby('puuid')
+            for puuid, group in grouped:
+                summoner_name = group['summonerName'].iloc[0]
+                match_id = group['matchId'].iloc[0]
+
+                # Create a unique and clean file name
+                file_name = f"{summoner_name}_{match_id}.csv".replace(" ", "_")
+                output_path = os.path.join(output_dir, file_name)
+
+                # Save the group data to the output path
+                group.to_csv(output_path, index=False)
+                print(f"Saved: {output_path}")
+
+        except Exception as e:
+            print(f"Error processing file {file_path}: {e}")
+
+
+def export_player_history(root_dir, puuid, output_path):
+    """
+    Write every indexed row for one player into a single CSV,
+    reading only the Player_Data.csv files that player appears in.
+    """
+    with MatchIndex(root_dir) as index:
+        index.ensure_built()
+        rows = index.rows_for_puuids([puuid])[puuid]
+
+    history = []
+    for match_id, match_dir, row_index in rows:
+        file_path = os.path.join(match_dir, PLAYER_DATA_FILE)
+        try:
+            # Skip straight to the player's row (+1 for the header line)
+            df = pd.read_csv(file_path, skiprows=range(1, row_index + 1), nrows=1)
+            if df.empty or df['puuid'].iloc[0] != puuid:
+                # Row order changed since indexing; fall back to filtering the file
+                df = pd.read_csv(file_path)
+                df = df[df['puuid'] == puuid]
+            history.append(df)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+
+    if not history:
+        print(f"No indexed matches for PUUID {puuid}")
+        return None
+
+    history_df = pd.concat(history, ignore_index=True)
+    history_df.to_csv(output_path, index=False)
+    print(f"Saved {len(history_df)} matches for {puuid} to {output_path}")
+    return history_df
+
+
+def main(puuids=None):
+    """
+    Split the configured processed CSV directory into per-player match files.
+    """
+    config = get_config()
+    input_root_dir = config["processed_csv_dir"]
+    output_directory = config["match_data_dir"]
+
+    # Ensure the output directory exists
+    os.makedirs(output_directory, exist_ok=True)
+
+    # Execute the function
+    split_and_save_by_puuid(input_root_dir, output_directory, puuids=puuids)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
 import pandas as pd
 import json
+from config import get_config
 
 
 def parse_challenges_column(df):
     """Optimized parsing of JSON-like 'challenges' column with duplicate column handling."""
+    if 'challenges' not in df.columns and any(col.startswith('challenges_') for col in df.columns):
+        return df  # Already flattened into typed columns at ingest
     if 'challenges' in df.columns:
         try:
             # Validate JSON strings
@@ -142,13 +145,22 @@ def aggregate_player_data(input_dir, output_aggregated_file, output_ai_file):
     print(f"AI-ready dataset saved to {output_ai_file}")
 
 
-# Define input and output paths
-input_directory = "C:/Users/ssass/PycharmProjects/LeagueAIProject_V4/ai_data/match_data"
-output_aggregated_file = "C:/Users/ssass/PycharmProjects/LeagueAIProject_V4/ai_data/aggregated_player_data.csv"
-output_ai_file = "C:/Users/ssass/PycharmProjects/LeagueAIProject_V4/ai_data/ai_ready_dataset.csv"
+def main():
+    """
+    Aggregate the configured per-player match files into the training datasets.
+    """
+    config = get_config()
+    input_directory = config["match_data_dir"]
+    output_aggregated_file = config["aggregated_file"]
+    output_ai_file = config["ai_ready_file"]
+
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(output_aggregated_file), exist_ok=True)
+    os.makedirs(os.path.dirname(output_ai_file), exist_ok=True)
+
+    # Execute the aggregation and AI streamlining
+    aggregate_player_data(input_directory, output_aggregated_file, output_ai_file)
 
-# Ensure output directory exists
-os.makedirs(os.path.dirname(output_aggregated_file), exist_ok=True)
 
-# Execute the aggregation and AI streamlining
-aggregate_player_data(input_directory, output_aggregated_file, output_ai_file)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import os
+import csv
+import sqlite3
+import threading
+
+INDEX_FILE_NAME = "match_index.sqlite"
+PLAYER_DATA_FILE = "Player_Data.csv"
+
+# SQLite caps the number of bound parameters per statement, so batch lookups are chunked
+LOOKUP_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    location TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_matches (
+    puuid TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    PRIMARY KEY (puuid, match_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_matches_by_match ON player_matches (match_id);
+CREATE TABLE IF NOT EXISTS players (
+    puuid TEXT PRIMARY KEY,
+    summoner_name TEXT,
+    game_name TEXT,
+    tag_line TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _chunked(values, size=LOOKUP_CHUNK_SIZE):
+    """
+    Yield successive lists of at most `size` items.
+    """
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class MatchIndex:
+    """
+    Persistent inverted index over the processed CSV tree:
+    - puuid -> match IDs (and the player's row within Player_Data.csv)
+    - match ID -> storage location of its CSV directory
+    """
+    def __init__(self, root_dir, index_path=None):
+        """
+        Open (or create) the index for `root_dir`. Locations are stored relative
+        to `root_dir` so the processed data can be moved without a rebuild.
+        """
+        self.root_dir = root_dir
+        self.index_path = index_path or os.path.join(root_dir, INDEX_FILE_NAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+
+        # The converter writes from the watchdog observer thread, so share one guarded connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _relative(self, location):
+        return os.path.relpath(os.path.abspath(location), os.path.abspath(self.root_dir))
+
+    def _absolute(self, location):
+        return os.path.join(self.root_dir, location)
+
+    def add_match(self, match_id, location, players):
+        """
+        Record a processed match. `players` are the Player_Data rows in file order;
+        re-adding a match replaces its previous entries.
+        """
+        player_rows = []
+        player_names = []
+        for row_index, player in enumerate(players):
+            puuid = player.get("puuid")
+            if not puuid:
+                continue
+            player_rows.append((puuid, match_id, row_index))
+            player_names.append((
+                puuid,
+                player.get("summonerName") or None,
+                player.get("riotIdGameName") or None,
+                player.get("riotIdTagline") or None,
+            ))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO matches (match_id, location) VALUES (?, ?)",
+                (match_id, self._relative(location)),
+            )
+            self._conn.execute("DELETE FROM player_matches WHERE match_id = ?", (match_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO player_matches (puuid, match_id, row_index) VALUES (?, ?, ?)",
+                player_rows,
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO players (puuid, summoner_name, game_name, tag_line) VALUES (?, ?, ?, ?)
+                ON CONFLICT (puuid) DO UPDATE SET
+                    summoner_name = COALESCE(excluded.summoner_name, summoner_name),
+                    game_name = COALESCE(excluded.game_name, game_name),
+                    tag_line = COALESCE(excluded.tag_line, tag_line)
+                """,
+                player_names,
+            )
+
+    def set_player_names(self, puuid, game_name, tag_line):
+        """
+        Store a resolved Riot ID for a PUUID.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO players (puuid, game_name, tag_line) VALUES (?, ?, ?)
+                ON CONFLICT (puuid) DO UPDATE SET game_name = excluded.game_name, tag_line = excluded.tag_line
+                """,
+                (puuid, game_name, tag_line),
+            )
+
+    def _select_in(self, query, values):
+        """
+        Run `query` (containing a single `{placeholders}` slot) over `values` in chunks.
+        """
+        results = []
+        with self._lock:
+            for chunk in _chunked(values):
+                placeholders = ",".join("?" * len(chunk))
+                results.extend(self._conn.execute(query.format(placeholders=placeholders), chunk).fetchall())
+        return results
+
+    def matches_for_puuids(self, puuids):
+        """
+        Batch lookup: return {puuid: [match_id, ...]} for every requested PUUID.
+        """
+        result = {puuid: [] for puuid in puuids}
+        rows = self._select_in(
+            "SELECT puuid, match_id FROM player_matches WHERE puuid IN ({placeholders}) ORDER BY puuid, match_id",
+            result.keys(),
+        )
+        for puuid, match_id in rows:
+            result[puuid].append(match_id)
+        return result
+
+    def locations_for_matches(self, match_ids):
+        """
+        Batch lookup: return {match_id: absolute directory} for the indexed match IDs.
+        """
+        rows = self._select_in(
+            "SELECT match_id, location FROM matches WHERE match_id IN ({placeholders})",
+            set(match_ids),
+        )
+        return {match_id: self._absolute(location) for match_id, location in rows}
+
+    def rows_for_puuids(self, puuids):
+        """
+        Batch lookup: return {puuid: [(match_id, directory, row_index), ...]} so callers
+        can read exactly the Player_Data.csv files (and rows) a player appears in.
+        """
+        result = {puuid: [] for puuid in puuids}
+        rows = self._select_in(
+            """
+            SELECT pm.puuid, pm.match_id, m.location, pm.row_index
+            FROM player_matches pm JOIN matches m ON m.match_id = pm.match_id
+            WHERE pm.puuid IN ({placeholders})
+            ORDER BY pm.puuid, pm.match_id
+            """,
+            result.keys(),
+        )
+        for puuid, match_id, location, row_index in rows:
+            result[puuid].append((match_id, self._absolute(location), row_index))
+        return result
+
+    def names_for_puuids(self, puuids):
+        """
+        Batch lookup: return {puuid: (summoner_name, game_name, tag_line)} for known PUUIDs.
+        """
+        rows = self._select_in(
+            "SELECT puuid, summoner_name, game_name, tag_line FROM players WHERE puuid IN ({placeholders})",
+            set(puuids),
+        )
+        return {puuid: (summoner_name, game_name, tag_line) for puuid, summoner_name, game_name, tag_line in rows}
+
+    def all_puuids(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT puuid FROM player_matches ORDER BY puuid")]
+
+    def match_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def rebuild_from_directory(self):
+        """
+        Backfill the index with one walk over existing `{match_id}_data/Player_Data.csv`
+        directories written before the converter maintained the index.
+        """
+        indexed = 0
+        for subdir, dirs, files in os.walk(self.root_dir):
+            if PLAYER_DATA_FILE not in files:
+                continue
+            dir_name = os.path.basename(subdir)
+            match_id = dir_name[:-len("_data")] if dir_name.endswith("_data") else dir_name
+            try:
+                with open(os.path.join(subdir, PLAYER_DATA_FILE), newline="", encoding="utf-8") as file:
+                    players = list(csv.DictReader(file))
+            except (OSError, csv.Error) as e:
+                print(f"Error indexing {subdir}: {e}")
+                continue
+            if players and players[0].get("matchId"):
+                match_id = players[0]["matchId"]
+            self.add_match(match_id, subdir, players)
+            indexed += 1
+        return indexed
+
+    def ensure_built(self):
+        """
+        Backfill from disk once per index. The flag is only set after a complete walk, so
+        legacy directories are still picked up if the converter indexed new matches first
+        or a previous backfill was interrupted.
+        """
+        if self._get_meta("backfilled") is None:
+            self.rebuild_from_directory()
+            self._set_meta("backfilled", "1")
+        return self
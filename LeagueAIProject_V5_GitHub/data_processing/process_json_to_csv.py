@@ -6,15 +6,19 @@ from logging.handlers import RotatingFileHandler
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import time
+from config import get_config
+from .match_index import MatchIndex
+from .projection import get_profile, project_match, iter_archived_matches
 
 # Directories and files
-RAW_JSON_DIR = "C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data/shared_json_data"
-PROCESSED_CSV_DIR = "C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data/processed_csv_data"
-LOG_FILE = "C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data/logs/processed_ids.log"
+CONFIG = get_config()
+RAW_JSON_DIR = CONFIG["raw_json_dir"]
+PROCESSED_CSV_DIR = CONFIG["processed_csv_dir"]
+LOG_FILE = CONFIG["processed_ids_log"]
+RAW_ARCHIVE_DIR = CONFIG["raw_archive_dir"]
 
-# Create directories if they don't exist
-os.makedirs(PROCESSED_CSV_DIR, exist_ok=True)
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+# Fields kept in the CSVs (see projection.PROFILES)
+PROJECTION_PROFILE = CONFIG["projection_profile"]
 
 # Logging setup
 def setup_logging():
@@ -31,7 +35,17 @@ def setup_logging():
         ]
     )
 
-setup_logging()
+# Inverted puuid/match index, kept up to date as CSVs are written (opened on first use)
+match_index = None
+
+def get_match_index():
+    """
+    Open the match index for the processed CSV directory once and reuse it.
+    """
+    global match_index
+    if match_index is None:
+        match_index = MatchIndex(PROCESSED_CSV_DIR)
+    return match_index
 
 def read_processed_ids():
     """
@@ -61,6 +75,47 @@ def preprocess_value(value):
     else:
         return value
 
+def write_match_csvs(match_id, match_data, profile):
+    """
+    Project a match payload with the given profile and write its Player_Data,
+    Match_Data, and Misc_Data CSV files.
+    """
+    match_data = project_match(match_data, profile)
+    output_dir = os.path.join(PROCESSED_CSV_DIR, f"{match_id}_data")
+    os.makedirs(output_dir, exist_ok=True)
+
+    match_info = match_data.get("info", {})
+    match_metadata = match_data.get("metadata", {})
+
+    # Player_Data CSV
+    player_data = []
+    for participant in match_info.get("participants", []):
+        player_row = {key: preprocess_value(value) for key, value in participant.items()}
+        player_row["matchId"] = match_id
+        player_data.append(player_row)
+    pd.DataFrame(player_data).to_csv(os.path.join(output_dir, "Player_Data.csv"), index=False)
+    get_match_index().add_match(match_id, output_dir, player_data)
+
+    # Match_Data CSV
+    match_row = {
+        "matchId": match_id,
+        "gameId": match_info.get("gameId"),
+        "gameDuration": match_info.get("gameDuration"),
+        "gameMode": match_info.get("gameMode"),
+        "gameType": match_info.get("gameType"),
+        "gameVersion": match_info.get("gameVersion"),
+        "mapId": match_info.get("mapId"),
+    }
+    pd.DataFrame([match_row]).to_csv(os.path.join(output_dir, "Match_Data.csv"), index=False)
+
+    # Misc_Data CSV
+    misc_row = {
+        "matchId": match_id,
+        "dataVersion": match_metadata.get("dataVersion"),
+        "participants": json.dumps(match_metadata.get("participants") or []),
+    }
+    pd.DataFrame([misc_row]).to_csv(os.path.join(output_dir, "Misc_Data.csv"), index=False)
+
 def process_match_json(file_path):
     """
     Convert a single JSON file into Player_Data, Match_Data, and Misc_Data CSV files.
@@ -70,39 +125,7 @@ def process_match_json(file_path):
             match_data = json.load(file)  # Will throw error if JSON is malformed
 
         match_id = os.path.splitext(os.path.basename(file_path))[0]
-        output_dir = os.path.join(PROCESSED_CSV_DIR, f"{match_id}_data")
-        os.makedirs(output_dir, exist_ok=True)
-
-        match_info = match_data.get("info", {})
-        match_metadata = match_data.get("metadata", {})
-
-        # Player_Data CSV
-        player_data = []
-        for participant in match_info.get("participants", []):
-            player_row = {key: preprocess_value(value) for key, value in participant.items()}
-            player_row["matchId"] = match_id
-            player_data.append(player_row)
-        pd.DataFrame(player_data).to_csv(os.path.join(output_dir, "Player_Data.csv"), index=False)
-
-        # Match_Data CSV
-        match_row = {
-            "matchId": match_id,
-            "gameId": match_info.get("gameId"),
-            "gameDuration": match_info.get("gameDuration"),
-            "gameMode": match_info.get("gameMode"),
-            "gameType": match_info.get("gameType"),
-            "gameVersion": match_info.get("gameVersion"),
-            "mapId": match_info.get("mapId"),
-        }
-        pd.DataFrame([match_row]).to_csv(os.path.join(output_dir, "Match_Data.csv"), index=False)
-
-        # Misc_Data CSV
-        misc_row = {
-            "matchId": match_id,
-            "dataVersion": match_metadata.get("dataVersion"),
-            "participants": json.dumps(match_metadata.get("participants", [])),
-        }
-        pd.DataFrame([misc_row]).to_csv(os.path.join(output_dir, "Misc_Data.csv"), index=False)
+        write_match_csvs(match_id, match_data, get_profile(PROJECTION_PROFILE))
 
         logging.info(f"Processed and saved CSV files for match {match_id}")
 
@@ -186,12 +209,40 @@ def process_existing_files(processed_ids):
 
     logging.info("Finished processing existing files.")
 
-def monitor_directory():
+def reproject_archive(profile_name=PROJECTION_PROFILE):
+    """
+    Rebuild the CSVs of every archived match with the given profile,
+    e.g. after a profile gains fields.
+    """
+    profile = get_profile(profile_name)
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    setup_logging()
+
+    count = 0
+    for match_id, match_data in iter_archived_matches(RAW_ARCHIVE_DIR):
+        try:
+            write_match_csvs(match_id, match_data, profile)
+            count += 1
+        except Exception as e:
+            logging.error(f"Error re-projecting match {match_id}: {e}")
+    logging.info(f"Re-projected {count} archived matches with the '{profile_name}' profile.")
+    return count
+
+def monitor_directory(once=False):
     """
     Processes existing files and then monitors the directory for new JSON files.
+    With once=True, returns after the existing files are processed.
     """
+    # Create directories if they don't exist
+    os.makedirs(PROCESSED_CSV_DIR, exist_ok=True)
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    setup_logging()
+
     processed_ids = read_processed_ids()
+    get_match_index().ensure_built()
     process_existing_files(processed_ids)
+    if once:
+        return
 
     event_handler = NewFileHandler(processed_ids)
     observer = Observer()
@@ -0,0 +1,186 @@
+import gzip
+import json
+import os
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
+
+
+# Fields every non-full profile keeps so matches stay identifiable and indexable
+IDENTITY_FIELDS = {
+    "puuid": str,
+    "summonerName": str,
+    "riotIdGameName": str,
+    "riotIdTagline": str,
+    "teamId": int,
+    "championName": str,
+    "teamPosition": str,
+}
+
+# Match-level fields read by the converter (Match_Data.csv / Misc_Data.csv)
+MATCH_INFO_FIELDS = {
+    "gameId": int,
+    "gameCreation": int,
+    "gameDuration": int,
+    "gameMode": str,
+    "gameType": str,
+    "gameVersion": str,
+    "mapId": int,
+    "queueId": int,
+}
+MATCH_METADATA_FIELDS = {
+    "matchId": str,
+    "dataVersion": str,
+    "participants": list,
+}
+
+# Projection profiles. Each lists the participant fields to keep with the type they are
+# cast to, plus the `challenges` keys to keep. Those are flattened into typed `challenges_<key>`
+# columns (the names parse_challenges_column produces) so no stage has to parse nested JSON.
+# None keeps the full payload.
+PROFILES = {
+    "full": None,
+    "training": {
+        "participant": dict(IDENTITY_FIELDS, **{
+            "win": _to_bool,
+            "kills": int,
+            "deaths": int,
+            "assists": int,
+            "champLevel": int,
+            "goldEarned": int,
+            "goldSpent": int,
+            "totalMinionsKilled": int,
+            "neutralMinionsKilled": int,
+            "visionScore": int,
+            "wardsPlaced": int,
+            "wardsKilled": int,
+            "turretTakedowns": int,
+            "inhibitorTakedowns": int,
+            "baronKills": int,
+            "dragonKills": int,
+            "damageDealtToObjectives": int,
+            "damageDealtToBuildings": int,
+            "totalDamageDealtToChampions": int,
+            "totalDamageTaken": int,
+            "totalHeal": int,
+            "timeCCingOthers": int,
+            "timePlayed": int,
+            "firstBloodKill": _to_bool,
+            "firstTowerKill": _to_bool,
+        }),
+        "challenges": {
+            "kda": float,
+            "killParticipation": float,
+            "goldPerMinute": float,
+            "damagePerMinute": float,
+            "teamDamagePercentage": float,
+            "visionScorePerMinute": float,
+            "laneMinionsFirst10Minutes": float,
+            "soloKills": float,
+        },
+    },
+    "minimal": {
+        "participant": dict(IDENTITY_FIELDS, **{
+            "win": _to_bool,
+            "kills": int,
+            "deaths": int,
+            "assists": int,
+            "goldEarned": int,
+        }),
+        "challenges": {},
+    },
+}
+
+
+def get_profile(name):
+    """
+    Look up a projection profile by name.
+    """
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown projection profile: {name}. Choose from {', '.join(PROFILES)}")
+
+
+def _cast(value, caster):
+    """
+    Cast a value to its declared type, keeping None for missing or unconvertible values.
+    """
+    if value is None:
+        return None
+    if caster is list:
+        return list(value) if isinstance(value, (list, tuple)) else None
+    try:
+        return caster(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _select(source, fields):
+    return {field: _cast(source.get(field), caster) for field, caster in fields.items()}
+
+
+def project_participant(participant, profile):
+    """
+    Keep and type-cast only the participant fields declared by the profile,
+    flattening the kept challenges into `challenges_<key>` fields.
+    """
+    if profile is None:
+        return participant
+
+    row = _select(participant, profile["participant"])
+    challenges = participant.get("challenges")
+    for key, caster in profile["challenges"].items():
+        # Raw payloads nest challenges; already projected ones carry the flat field
+        value = challenges.get(key) if isinstance(challenges, dict) else participant.get(f"challenges_{key}")
+        row[f"challenges_{key}"] = _cast(value, caster)
+    return row
+
+
+def project_match(match_data, profile):
+    """
+    Project a Match-V5 payload. The result keeps the same metadata/info/participants shape,
+    so it can be projected again or converted exactly like a full payload.
+    """
+    if profile is None:
+        return match_data
+
+    match_info = match_data.get("info", {})
+    projected_info = _select(match_info, MATCH_INFO_FIELDS)
+    projected_info["participants"] = [
+        project_participant(participant, profile) for participant in match_info.get("participants", [])
+    ]
+    return {
+        "metadata": _select(match_data.get("metadata", {}), MATCH_METADATA_FIELDS),
+        "info": projected_info,
+    }
+
+
+def archive_path(archive_dir, match_id):
+    return os.path.join(archive_dir, f"{match_id}.json.gz")
+
+
+def archive_raw_match(archive_dir, match_id, match_data):
+    """
+    Store the full payload gzip-compressed so it can be re-projected when a profile changes.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    with gzip.open(archive_path(archive_dir, match_id), "wt", encoding="utf-8") as file:
+        json.dump(match_data, file, separators=(",", ":"))
+
+
+def iter_archived_matches(archive_dir):
+    """
+    Yield (match_id, full payload) for every archived match.
+    """
+    if not os.path.isdir(archive_dir):
+        return
+
+    for file_name in sorted(os.listdir(archive_dir)):
+        if not file_name.endswith(".json.gz"):
+            continue
+        with gzip.open(os.path.join(archive_dir, file_name), "rt", encoding="utf-8") as file:
+            yield file_name[:-len(".json.gz")], json.load(file)
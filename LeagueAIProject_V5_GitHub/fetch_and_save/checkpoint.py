@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import socket
+
+JOURNAL_SUFFIX = ".jsonl"
+
+
+def _pid_running(pid):
+    """
+    Best-effort liveness check for a process on this host. Only POSIX has a side-effect free
+    probe (on Windows signal 0 is CTRL_C_EVENT), so elsewhere the process is assumed alive
+    and adoption relies on the coordinator's lease check.
+    """
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # e.g. PermissionError: the PID exists but belongs to another user
+    return True
+
+
+class CrawlCheckpoint:
+    """
+    Append-only journal of crawl progress for one worker. For each PUUID in progress it records
+    the match IDs to fetch, the ones completed and the PUUIDs discovered so far, so a restarted
+    (or replacement) worker can resume without repeating requests or losing discovered players.
+
+    Records are single JSON lines:
+    - {"op": "start", "puuid": ..., "match_ids": [...]}
+    - {"op": "match", "puuid": ..., "match_id": ..., "discovered": [...]}
+    - {"op": "finish", "puuid": ...}
+    - {"op": "snapshot", "puuid": ..., "match_ids": [...], "done": [...], "discovered": [...]}
+    The journal is compacted into snapshot records every `compact_every` appends.
+    """
+    def __init__(self, checkpoint_dir, worker_id, compact_every=200):
+        self.checkpoint_dir = checkpoint_dir
+        self.worker_id = worker_id
+        self.compact_every = compact_every
+        self.path = os.path.join(checkpoint_dir, f"{worker_id}{JOURNAL_SUFFIX}")
+        self.state = {}  # puuid -> {"match_ids": [...], "done": set(), "discovered": set()}
+        self.adopted_workers = []  # Dead workers whose journals were taken over
+        self._appends = 0
+        self._file = None
+
+    @staticmethod
+    def _apply(state, record):
+        """
+        Replay one journal record into `state`.
+        """
+        op = record.get("op")
+        puuid = record.get("puuid")
+        if op in ("start", "snapshot"):
+            state[puuid] = {
+                "match_ids": list(record.get("match_ids", [])),
+                "done": set(record.get("done", [])),
+                "discovered": set(record.get("discovered", [])),
+            }
+        elif op == "match" and puuid in state:
+            state[puuid]["done"].add(record["match_id"])
+            state[puuid]["discovered"].update(record.get("discovered", []))
+        elif op == "finish":
+            state.pop(puuid, None)
+
+    @classmethod
+    def _load(cls, path):
+        """
+        Replay a journal file. A torn final line from a crash is ignored.
+        """
+        state = {}
+        with open(path, "r") as file:
+            for line in file:
+                try:
+                    cls._apply(state, json.loads(line))
+                except (ValueError, KeyError):
+                    logging.warning(f"Ignoring unreadable checkpoint record in {path}")
+        return state
+
+    @staticmethod
+    def _copy(state):
+        return {
+            puuid: {key: value.copy() for key, value in progress.items()}
+            for puuid, progress in state.items()
+        }
+
+    def _other_journals(self):
+        """
+        Yield (worker_id, path) for every other worker's journal.
+        """
+        if not os.path.isdir(self.checkpoint_dir):
+            return
+        for file_name in sorted(os.listdir(self.checkpoint_dir)):
+            path = os.path.join(self.checkpoint_dir, file_name)
+            if file_name.endswith(JOURNAL_SUFFIX) and path != self.path:
+                yield file_name[:-len(JOURNAL_SUFFIX)], path
+
+    @staticmethod
+    def _is_orphaned(worker_id, state, holds_live_leases):
+        """
+        A journal can be adopted once its worker has PUUIDs in progress but no longer holds any
+        live lease: a running worker keeps renewing the leases of the PUUIDs it journals, so
+        either it exited (crashed, or released its leases on shutdown) or its leases lapsed
+        and the work is being handed out again. A dead process on this host also qualifies.
+        """
+        if not state:
+            return False  # Nothing to resume; an idle worker may still be appending to it
+        host, _, pid = worker_id.rpartition("-")
+        if host == socket.gethostname() and pid.isdigit() and not _pid_running(int(pid)):
+            return True
+        return not holds_live_leases(worker_id)
+
+    def _adopt(self, worker_id, path):
+        """
+        Claim another worker's journal and merge its progress. Returns the adopted
+        {puuid: state}, or None if another worker claimed it first.
+        """
+        # Renaming claims the journal atomically; if it fails another worker got it first
+        claimed_path = f"{path}.{self.worker_id}.adopting"
+        try:
+            os.rename(path, claimed_path)
+        except OSError:
+            return None
+        adopted = self._load(claimed_path)
+        self.state.update(adopted)
+
+        # Persist the merged state before dropping the adopted journal
+        self.compact()
+        os.remove(claimed_path)
+        self.adopted_workers.append(worker_id)
+        if adopted:
+            logging.info(f"Adopted {len(adopted)} in-progress PUUID(s) from worker {worker_id}")
+        return adopted
+
+    def recover(self, holds_live_leases):
+        """
+        Load this worker's journal and adopt the journals of workers that are gone.
+        `holds_live_leases(worker_id)` asks the coordinator whether a worker is still renewing
+        its leases. Returns {puuid: state} for every PUUID that was in progress.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        if os.path.exists(self.path):
+            self.state.update(self._load(self.path))
+        self.compact()
+
+        for worker_id, path in self._other_journals():
+            try:
+                state = self._load(path)
+            except OSError:
+                continue  # Claimed by another worker meanwhile
+            if self._is_orphaned(worker_id, state, holds_live_leases):
+                self._adopt(worker_id, path)
+
+        return self._copy(self.state)
+
+    def adopt_for(self, puuid, holds_live_leases):
+        """
+        Called after leasing `puuid`: if another worker's journal still has it in progress
+        (the coordinator handed it out again because that worker's lease expired or was
+        released), adopt that journal so the PUUID resumes where it stopped.
+        Returns {puuid: state} for every PUUID adopted, including `puuid` if it was found.
+        """
+        for worker_id, path in self._other_journals():
+            try:
+                state = self._load(path)
+            except OSError:
+                continue  # Claimed by another worker meanwhile
+            if puuid in state and self._is_orphaned(worker_id, state, holds_live_leases):
+                adopted = self._adopt(worker_id, path)
+                if adopted is not None:
+                    return self._copy(adopted)
+        return {}
+
+    def _append(self, record):
+        if self._file is None:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()  # Survives a process crash; compaction fsyncs
+        self._apply(self.state, record)
+
+        self._appends += 1
+        if self._appends >= self.compact_every:
+            self.compact()
+
+    def start(self, puuid, match_ids):
+        self._append({"op": "start", "puuid": puuid, "match_ids": list(match_ids)})
+
+    def match_done(self, puuid, match_id, discovered):
+        self._append({"op": "match", "puuid": puuid, "match_id": match_id, "discovered": sorted(p for p in discovered if p)})
+
+    def finish(self, puuid):
+        self._append({"op": "finish", "puuid": puuid})
+        if not self.state:
+            self.compact()  # Nothing in progress: shrink the journal to empty
+
+    def compact(self):
+        """
+        Rewrite the journal as one snapshot record per in-progress PUUID.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            for puuid, progress in self.state.items():
+                file.write(json.dumps({
+                    "op": "snapshot",
+                    "puuid": puuid,
+                    "match_ids": progress["match_ids"],
+                    "done": sorted(progress["done"]),
+                    "discovered": sorted(progress["discovered"]),
+                }, separators=(",", ":")) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self._appends = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,340 @@
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager
+
+# Work item states
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puuids (
+    puuid TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    owner TEXT,
+    lease_expires REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS puuids_by_state ON puuids (state, updated_at);
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    owner TEXT,
+    lease_expires REAL
+);
+CREATE TABLE IF NOT EXISTS request_slots (
+    key_id TEXT NOT NULL,
+    granted_at REAL NOT NULL,
+    worker_id TEXT
+);
+CREATE INDEX IF NOT EXISTS request_slots_by_key ON request_slots (key_id, granted_at);
+"""
+
+
+def default_worker_id():
+    """
+    Identify this crawler process across machines. On platforms that name their processes
+    (e.g. $DYNO on Heroku) the name is reused, so a restarted process reopens its own journal.
+    """
+    return os.environ.get("DYNO") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def api_key_id(api_key):
+    """
+    Stable, non-secret identifier for an API key so budgets can be shared without storing the key.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class SqliteCoordinator:
+    """
+    Shares crawl work between crawler processes through one SQLite database:
+    - PUUID and match ID leases that expire if the holding worker stops renewing them
+    - a sliding-window request budget per API key
+    All methods take the caller's worker ID so a single instance can also serve remote workers.
+    """
+    def __init__(self, db_path, lease_seconds=300):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        # Autocommit mode so transactions can be opened with BEGIN IMMEDIATE, which takes the
+        # write lock up front and keeps read-then-update lease decisions atomic across processes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue_puuids(self, puuids):
+        """
+        Queue PUUIDs for crawling. PUUIDs already queued, leased or done are left alone.
+        Returns the number of newly queued PUUIDs.
+        """
+        now = time.time()
+        rows = [(puuid, QUEUED, now) for puuid in puuids if puuid]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO puuids (puuid, state, updated_at) VALUES (?, ?, ?)", rows)
+            return conn.total_changes - before
+
+    def lease_puuid(self, worker_id):
+        """
+        Lease the oldest queued PUUID, or one whose lease has expired. Returns None if there is none.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                """
+                SELECT puuid FROM puuids
+                WHERE state = ? OR (state = ? AND lease_expires < ?)
+                ORDER BY updated_at LIMIT 1
+                """,
+                (QUEUED, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE puuids SET state = ?, owner = ?, lease_expires = ?, updated_at = ? WHERE puuid = ?",
+                (LEASED, worker_id, now + self.lease_seconds, now, row[0]),
+            )
+            return row[0]
+
+    def take_over_puuid(self, puuid, worker_id):
+        """
+        Lease a specific PUUID, e.g. to resume it from a checkpoint. Returns False if it is
+        already done or leased by another worker whose lease is still live.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT state, owner, lease_expires FROM puuids WHERE puuid = ?", (puuid,)).fetchone()
+            if row is not None:
+                state, owner, lease_expires = row
+                if state == DONE:
+                    return False
+                if state == LEASED and owner != worker_id and lease_expires is not None and lease_expires >= now:
+                    return False
+            conn.execute(
+                "INSERT OR REPLACE INTO puuids (puuid, state, owner, lease_expires, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (puuid, LEASED, worker_id, now + self.lease_seconds, now),
+            )
+            return True
+
+    def complete_puuid(self, puuid, worker_id):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE puuids SET state = ?, owner = ?, lease_expires = NULL, updated_at = ? WHERE puuid = ?",
+                (DONE, worker_id, time.time(), puuid),
+            )
+
+    def has_pending_puuids(self):
+        """
+        True if any PUUID is queued or still leased, i.e. the crawl has not run dry.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM puuids WHERE state != ? LIMIT 1", (DONE,)).fetchone()
+        return row is not None
+
+    def claim_match(self, match_id, worker_id):
+        """
+        Lease a match ID for download. Returns False if it is already done or
+        leased by another worker whose lease is still live.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT state, owner, lease_expires FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+            if row is not None:
+                state, owner, lease_expires = row
+                if state == DONE:
+                    return False
+                if owner != worker_id and lease_expires is not None and lease_expires >= now:
+                    return False
+            conn.execute(
+                "INSERT OR REPLACE INTO matches (match_id, state, owner, lease_expires) VALUES (?, ?, ?, ?)",
+                (match_id, LEASED, worker_id, now + self.lease_seconds),
+            )
+            return True
+
+    def complete_match(self, match_id, worker_id):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO matches (match_id, state, owner, lease_expires) VALUES (?, ?, ?, NULL)",
+                (match_id, DONE, worker_id),
+            )
+
+    def holds_live_leases(self, worker_id):
+        """
+        True if the worker holds any lease that has not expired, i.e. it is still heartbeating.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT 1 FROM puuids WHERE owner = ? AND state = ? AND lease_expires >= ?
+                UNION ALL
+                SELECT 1 FROM matches WHERE owner = ? AND state = ? AND lease_expires >= ?
+                LIMIT 1
+                """,
+                (worker_id, LEASED, now, worker_id, LEASED, now),
+            ).fetchone()
+        return row is not None
+
+    def release_match(self, match_id, worker_id):
+        """
+        Drop this worker's lease on a match so it can be claimed again.
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM matches WHERE match_id = ? AND owner = ? AND state = ?", (match_id, worker_id, LEASED))
+
+    def renew_leases(self, worker_id):
+        """
+        Heartbeat: extend every lease held by this worker.
+        """
+        expires = time.time() + self.lease_seconds
+        with self._transaction() as conn:
+            conn.execute("UPDATE puuids SET lease_expires = ? WHERE owner = ? AND state = ?", (expires, worker_id, LEASED))
+            conn.execute("UPDATE matches SET lease_expires = ? WHERE owner = ? AND state = ?", (expires, worker_id, LEASED))
+
+    def release_all(self, worker_id):
+        """
+        Give back every lease held by this worker (on shutdown).
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE puuids SET state = ?, owner = NULL, lease_expires = NULL WHERE owner = ? AND state = ?",
+                (QUEUED, worker_id, LEASED),
+            )
+            conn.execute("DELETE FROM matches WHERE owner = ? AND state = ?", (worker_id, LEASED))
+
+    def reserve_request(self, key_id, request_limit, window_seconds, worker_id):
+        """
+        Take one request slot from the shared budget for an API key.
+        Returns 0 if granted, otherwise the seconds to wait before asking again.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM request_slots WHERE key_id = ? AND granted_at <= ?", (key_id, now - window_seconds))
+            count, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(granted_at) FROM request_slots WHERE key_id = ?", (key_id,)
+            ).fetchone()
+            if count >= request_limit:
+                return max(0.01, window_seconds - (now - oldest))
+            conn.execute(
+                "INSERT INTO request_slots (key_id, granted_at, worker_id) VALUES (?, ?, ?)",
+                (key_id, now, worker_id),
+            )
+            return 0
+
+
+class SharedRateLimiter:
+    def __init__(self, coordinator, api_key, request_limit, window_seconds, worker_id, heartbeat=None):
+        """
+        Initialize the SharedRateLimiter with:
+        - coordinator: Backend holding the request budget shared by all workers.
+        - api_key: Key whose budget is drawn from (only a hash of it is shared).
+        - request_limit: Total requests allowed in the window across all workers (e.g., 99).
+        - window_seconds: Time window for the limit in seconds (e.g., 120 seconds).
+        - heartbeat: Optional callable run before each wait so leases stay live while throttled.
+        """
+        self.coordinator = coordinator
+        self.heartbeat = heartbeat
+        self.key_id = api_key_id(api_key)
+        self.request_limit = request_limit
+        self.window_seconds = window_seconds
+        self.worker_id = worker_id
+
+    async def acquire(self):
+        """
+        Wait until the shared budget grants this worker a request slot.
+        """
+        while True:
+            sleep_time = self.coordinator.reserve_request(
+                self.key_id, self.request_limit, self.window_seconds, self.worker_id
+            )
+            if sleep_time <= 0:
+                return
+            logging.info(f"Shared rate limit reached. Sleeping for {sleep_time:.2f} seconds...")
+            if self.heartbeat is not None:
+                self.heartbeat()
+            await asyncio.sleep(sleep_time)
+
+
+class _CoordinatorServerManager(BaseManager):
+    pass
+
+
+class _CoordinatorClientManager(BaseManager):
+    pass
+
+
+_CoordinatorClientManager.register("get_coordinator")
+
+
+def _require_authkey(authkey):
+    """
+    The TCP backend exchanges pickled data, so an unauthenticated connection could run
+    arbitrary code on the other side. Never run it without a shared secret.
+    """
+    if not authkey:
+        raise ValueError("coordinator_authkey must be set to a shared secret to use the tcp coordinator.")
+    return authkey.encode()
+
+
+def parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def serve_coordinator(db_path, address, authkey, lease_seconds=300):
+    """
+    Serve a SqliteCoordinator over TCP so crawlers on other machines can share it.
+    """
+    authkey = _require_authkey(authkey)
+    coordinator = SqliteCoordinator(db_path, lease_seconds)
+    _CoordinatorServerManager.register("get_coordinator", callable=lambda: coordinator)
+    manager = _CoordinatorServerManager(address=parse_address(address), authkey=authkey)
+    server = manager.get_server()
+    logging.info(f"Coordinator listening on {address} (database {db_path})")
+    server.serve_forever()
+
+
+def connect_coordinator(address, authkey):
+    """
+    Connect to a coordinator started with serve_coordinator; returns a proxy with the same methods.
+    """
+    manager = _CoordinatorClientManager(address=parse_address(address), authkey=_require_authkey(authkey))
+    manager.connect()
+    return manager.get_coordinator()
+
+
+def open_coordinator(config):
+    """
+    Open the coordination backend selected by the `coordinator_backend` setting.
+    """
+    backend = config["coordinator_backend"]
+    if backend == "sqlite":
+        return SqliteCoordinator(config["coordinator_db"], config["lease_seconds"])
+    if backend == "tcp":
+        return connect_coordinator(config["coordinator_address"], config["coordinator_authkey"])
+    raise ValueError(f"Unknown coordinator backend: {backend}")
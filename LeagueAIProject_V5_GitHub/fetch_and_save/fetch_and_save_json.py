@@ -2,22 +2,40 @@ import asyncio
 import logging
 import os
 import json
+import time
 from logging.handlers import RotatingFileHandler
-from fetch_utils import fetch_match_ids, fetch_match_data
-from puuid_management import get_user_puuid, log_used_puuid, repopulate_puuid_file
+from config import get_config
+from .fetch_utils import fetch_match_ids, fetch_match_data_with_status
+from .puuid_management import get_user_puuid, log_used_puuid, import_puuid_file, puuid_file_exists, PUUID_FILE, USED_PUUID_FILE
+from .retry_queue import RetryScheduler, CircuitBreaker, PERMANENT, AUTH_ERROR
+from .coordination import open_coordinator, default_worker_id, SharedRateLimiter
+from .checkpoint import CrawlCheckpoint
+from data_processing.projection import get_profile, project_match, archive_raw_match
 
-# Define the base directory
-BASE_DIR = "C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data"
+CONFIG = get_config()
 
 # Directory to store raw JSON files
-SHARED_DIR = os.path.join(BASE_DIR, "shared_json_data")
-os.makedirs(SHARED_DIR, exist_ok=True)
+SHARED_DIR = CONFIG["raw_json_dir"]
 
 # Log file path
-LOG_FILE = os.path.join(BASE_DIR, "fetch_and_save.log")
+LOG_FILE = CONFIG["crawl_log"]
+
+# Full payloads are archived compressed; only the projected fields go to the converter
+RAW_ARCHIVE_DIR = CONFIG["raw_archive_dir"]
+ARCHIVE_RAW = CONFIG["archive_raw"]
+PROJECTION = get_profile(CONFIG["projection_profile"])
+
+# Match IDs that failed permanently (e.g., 404)
+DEAD_LETTER_FILE = CONFIG["dead_letter_file"]
 
 # Retry delay for 429 errors
-RETRY_DELAY = 60  # Sleep for 60 seconds on 429 Too Many Requests
+RETRY_DELAY = CONFIG["retry_delay"]  # Sleep on 429 Too Many Requests
+
+# Identifies this process to the coordinator; several workers may run on one or more machines
+WORKER_ID = CONFIG["worker_id"] or default_worker_id()
+
+# How long to wait for other workers to queue PUUIDs before asking for a new seed
+IDLE_DELAY = 10
 
 def setup_logging():
     """
@@ -33,86 +51,184 @@ def setup_logging():
         handlers=[logging.StreamHandler(), file_handler]
     )
 
-class RateLimiter:
-    def __init__(self, request_limit, window_seconds):
-        """
-        Initialize the RateLimiter with:
-        - request_limit: Total requests allowed in the window (e.g., 99).
-        - window_seconds: Time window for the limit in seconds (e.g., 120 seconds).
-        """
-        self.request_limit = request_limit
-        self.window_seconds = window_seconds
-        self.request_times = []
+retry_scheduler = RetryScheduler(
+    DEAD_LETTER_FILE, max_attempts=CONFIG["max_attempts"], exhausted_expiry=CONFIG["dead_letter_expiry"]
+)
+circuit_breaker = CircuitBreaker(failure_threshold=5, cooldown_seconds=2 * RETRY_DELAY)
+
+# Shared work queue and request budget; opened in main()
+coordinator = None
+rate_limiter = None
+
+# Per-worker progress journal for resuming after a crash; opened in main()
+checkpoint = None
+
+# Progress adopted from other workers' journals, waiting to be resumed by this worker
+pending_resumes = {}
+
+def heartbeat():
+    """
+    Keep this worker's coordinator leases fresh so other workers don't treat it as dead
+    and adopt its journal.
+    """
+    coordinator.renew_leases(WORKER_ID)
+
+async def sleep_with_heartbeat(seconds):
+    """
+    Sleep for `seconds`, heartbeating often enough that no lease expires meanwhile.
+    """
+    interval = max(1, CONFIG["lease_seconds"] / 3)
+    while seconds > 0:
+        heartbeat()
+        await asyncio.sleep(min(seconds, interval))
+        seconds -= interval
+
+async def fetch_and_store_match(match_id, extracted_puuids):
+    """
+    Fetch one match, save it to a JSON file and collect its participants' PUUIDs.
+    Failures are handed to the retry scheduler instead of being retried inline.
+    """
+    if not circuit_breaker.allow():
+        wait_time = circuit_breaker.remaining()
+        logging.warning(f"Match endpoint circuit is open. Waiting {wait_time:.2f} seconds before the next request...")
+        await sleep_with_heartbeat(wait_time)
+
+    await rate_limiter.acquire()  # Enforce rate limit for each request
+    status, match_data = await fetch_match_data_with_status(match_id)
+
+    if match_data is None:
+        error_class = retry_scheduler.record_failure(match_id, status)
+        if error_class == PERMANENT:
+            coordinator.complete_match(match_id, WORKER_ID)  # No other worker should try it either
+        elif not retry_scheduler.is_pending(match_id):
+            coordinator.release_match(match_id, WORKER_ID)  # Out of attempts; retried once its dead letter expires
+
+        if error_class == PERMANENT:
+            circuit_breaker.record_success()  # The endpoint answered; the match just doesn't exist
+        elif error_class == AUTH_ERROR:
+            logging.error(f"API key rejected (status {status}). Check api_key / RIOT_API_KEY.")
+            circuit_breaker.trip()
+        else:
+            circuit_breaker.record_failure()
+        if status == 429:
+            logging.warning(f"Received 429 Too Many Requests. Sleeping for {RETRY_DELAY} seconds...")
+            await sleep_with_heartbeat(RETRY_DELAY)
+        return False
+
+    circuit_breaker.record_success()
+    retry_scheduler.record_success(match_id)
+
+    if ARCHIVE_RAW:
+        archive_raw_match(RAW_ARCHIVE_DIR, match_id, match_data)
 
-    async def acquire(self):
-        """
-        Enforce the rate limit by tracking request timestamps.
-        """
-        now = asyncio.get_event_loop().time()
+    # Save the projected match data to a JSON file
+    file_path = os.path.join(SHARED_DIR, f"{match_id}.json")
+    with open(file_path, "w") as json_file:
+        json.dump(project_match(match_data, PROJECTION), json_file, separators=(",", ":"))
+    logging.info(f"Saved match data for {match_id} to {file_path}")
 
-        # Remove timestamps outside the window
-        self.request_times = [t for t in self.request_times if now - t < self.window_seconds]
+    # Extract PUUIDs from the match data
+    for participant in match_data.get("info", {}).get("participants", []):
+        extracted_puuids.add(participant.get("puuid"))
 
-        if len(self.request_times) >= self.request_limit:
-            sleep_time = self.window_seconds - (now - self.request_times[0])
-            logging.info(f"Rate limit reached. Sleeping for {sleep_time:.2f} seconds...")
-            await asyncio.sleep(sleep_time)
+    return True
 
-        self.request_times.append(now)
+# PUUIDs fetched by this worker but not yet finished -> PUUIDs discovered in their matches
+in_progress = {}
 
-rate_limiter = RateLimiter(request_limit=99, window_seconds=120)
+# Match IDs waiting in the retry queue -> the PUUID they were fetched for
+retry_owners = {}
 
-async def fetch_and_save_json(puuid):
+async def fetch_and_store_and_record(puuid, match_id):
+    """
+    Fetch one match and journal it, with the PUUIDs it added, against the PUUID it belongs to.
+    The match is only marked done for other workers once its file is written and journaled.
+    """
+    extracted_puuids = in_progress[puuid]
+    before = set(extracted_puuids)
+    if await fetch_and_store_match(match_id, extracted_puuids):
+        checkpoint.match_done(puuid, match_id, extracted_puuids - before)
+        coordinator.complete_match(match_id, WORKER_ID)
+
+    if retry_scheduler.is_pending(match_id):
+        retry_owners[match_id] = puuid
+    else:
+        retry_owners.pop(match_id, None)
+
+def has_pending_retries(puuid):
+    return puuid in retry_owners.values()
+
+def finish_puuid(puuid):
+    """
+    Queue the PUUIDs discovered for a fully crawled PUUID and mark it done.
+    """
+    extracted_puuids = in_progress.pop(puuid)
+
+    # Queue the discovered PUUIDs for all workers
+    extracted_puuids.discard(puuid)  # Avoid re-adding the current PUUID
+    if extracted_puuids:
+        queued = coordinator.enqueue_puuids(extracted_puuids)
+        logging.info(f"Queued {queued} new PUUIDs out of {len(extracted_puuids)} discovered.")
+
+    # Log the used PUUID
+    coordinator.complete_puuid(puuid, WORKER_ID)
+    log_used_puuid(puuid)
+    checkpoint.finish(puuid)
+
+async def run_due_retries(current_puuid=None):
+    """
+    Work in retries that have come due without holding up the crawl, then finish any
+    earlier PUUID whose last pending retry has resolved.
+    """
+    for retry_id in retry_scheduler.pop_due():
+        await fetch_and_store_and_record(retry_owners[retry_id], retry_id)
+
+    for puuid in list(in_progress):
+        if puuid != current_puuid and not has_pending_retries(puuid):
+            finish_puuid(puuid)
+
+async def fetch_and_save_json(puuid, resume=None):
     """
     Fetch match IDs and save match data to JSON files.
+    With `resume` (checkpointed progress for this PUUID), skip straight to the pending matches.
+    A PUUID with matches still in the retry queue stays open (and journaled) until they resolve.
     """
     try:
-        logging.info(f"Processing PUUID: {puuid}")
+        if resume is None:
+            logging.info(f"Processing PUUID: {puuid}")
 
-        # Fetch match IDs
-        match_ids = await fetch_match_ids(puuid)
-        logging.info(f"Fetched {len(match_ids)} match IDs for PUUID {puuid}")
+            # Fetch match IDs
+            await rate_limiter.acquire()
+            match_ids = await fetch_match_ids(puuid, count=CONFIG["match_count"])
+            logging.info(f"Fetched {len(match_ids)} match IDs for PUUID {puuid}")
 
-        extracted_puuids = set()
+            checkpoint.start(puuid, match_ids)
+            in_progress[puuid] = set()
+        else:
+            match_ids = [match_id for match_id in resume["match_ids"] if match_id not in resume["done"]]
+            in_progress[puuid] = set(resume["discovered"])
+            logging.info(f"Resuming PUUID {puuid}: {len(match_ids)} pending matches, "
+                         f"{len(in_progress[puuid])} PUUIDs already discovered")
 
         for match_id in match_ids:
-            while True:  # Keep retrying the same match_id if 429 is encountered
-                await rate_limiter.acquire()  # Enforce rate limit for each request
-                try:
-                    match_data = await fetch_match_data(match_id)
-
-                    if match_data is None:
-                        logging.error(f"Failed to fetch data for match ID {match_id}. Retrying...")
-                        continue  # Retry the same match ID
-
-                    # Save the match data to a JSON file
-                    file_path = os.path.join(SHARED_DIR, f"{match_id}.json")
-                    with open(file_path, "w") as json_file:
-                        json.dump(match_data, json_file)
-                    logging.info(f"Saved match data for {match_id} to {file_path}")
-
-                    # Extract PUUIDs from the match data
-                    for participant in match_data.get("info", {}).get("participants", []):
-                        extracted_puuids.add(participant.get("puuid"))
-
-                    break  # Exit retry loop for this match_id after success
-
-                except aiohttp.ClientResponseError as e:
-                    if e.status == 429:
-                        logging.warning(f"Received 429 Too Many Requests. Sleeping for {RETRY_DELAY} seconds...")
-                        await asyncio.sleep(RETRY_DELAY)
-                    else:
-                        logging.error(f"Error fetching match data for {match_id}: {e}")
-                        raise
-
-        # Update the PUUID file
-        extracted_puuids.discard(puuid)  # Avoid re-adding the current PUUID
-        if extracted_puuids:
-            repopulate_puuid_file(extracted_puuids)
-            logging.info(f"Repopulated PUUID file with {len(extracted_puuids)} new PUUIDs.")
-
-        # Log the used PUUID
-        log_used_puuid(puuid)
+            heartbeat()
+            await run_due_retries(current_puuid=puuid)
+
+            if retry_scheduler.is_dead(match_id):
+                logging.info(f"Skipping dead-lettered match ID {match_id}")
+                continue
+            if retry_scheduler.is_pending(match_id):
+                continue  # Already waiting in the retry queue
+            if not coordinator.claim_match(match_id, WORKER_ID):
+                continue  # Already fetched, or being fetched by another worker
+
+            await fetch_and_store_and_record(puuid, match_id)
+
+        await run_due_retries(current_puuid=puuid)
+        if has_pending_retries(puuid):
+            logging.info(f"PUUID {puuid} stays open until its queued retries resolve.")
+        else:
+            finish_puuid(puuid)
 
     except Exception as e:
         logging.error(f"Error processing PUUID {puuid}: {e}")
@@ -130,24 +246,106 @@ async def shutdown(loop):
     logging.info("Closing event loop...")
     loop.stop()
 
+def next_puuid():
+    """
+    Lease the next PUUID from the coordinator. If no worker has anything queued or
+    in progress, import a new PUUID file (prompting for a seed if none was ever given).
+    """
+    while True:
+        puuid = coordinator.lease_puuid(WORKER_ID)
+        if puuid:
+            return puuid
+
+        if not coordinator.has_pending_puuids():
+            if coordinator.enqueue_puuids(import_puuid_file()):
+                continue
+            if not puuid_file_exists():
+                get_user_puuid()
+                continue
+            logging.info(f"Crawl ran dry. Add PUUIDs to {PUUID_FILE} to continue.")
+
+        # Keep retrying queued matches while waiting for other workers to queue PUUIDs
+        next_retry = retry_scheduler.next_due_in()
+        wait_time = IDLE_DELAY if next_retry is None else min(IDLE_DELAY, next_retry)
+        logging.info(f"No PUUIDs available yet. Waiting {wait_time:.2f} seconds for other workers...")
+        time.sleep(wait_time)
+        heartbeat()
+        asyncio.get_event_loop().run_until_complete(run_due_retries())
+
+def adopt_abandoned_progress(puuid):
+    """
+    Look for a freshly leased PUUID in the journal of a worker that stopped (crashed, was
+    interrupted, or restarted under a new worker ID) so it resumes where that worker left off.
+    Returns its progress, or None; other PUUIDs from that journal are queued for resuming.
+    """
+    adopted = checkpoint.adopt_for(puuid, coordinator.holds_live_leases)
+    if not adopted:
+        return None
+    coordinator.release_all(checkpoint.adopted_workers[-1])  # Requeue its other expired leases
+    progress = adopted.pop(puuid)
+    pending_resumes.update(adopted)
+    return progress
+
+def resume_puuid(loop, puuid, progress):
+    """
+    Resume a checkpointed PUUID, or hand it back if another worker owns it now.
+    """
+    if coordinator.take_over_puuid(puuid, WORKER_ID):
+        loop.run_until_complete(fetch_and_save_json(puuid, resume=progress))
+    else:
+        # Another worker owns it now; keep the players discovered so far
+        coordinator.enqueue_puuids(progress["discovered"])
+        checkpoint.finish(puuid)
+
 def main():
     """
     Continuously fetch and process match data in a loop using a persistent event loop.
+    Several copies can run at once; they share work through the configured coordinator.
     """
+    global coordinator, rate_limiter, checkpoint
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    os.makedirs(os.path.dirname(USED_PUUID_FILE), exist_ok=True)
     setup_logging()
+
+    coordinator = open_coordinator(CONFIG)
+    rate_limiter = SharedRateLimiter(
+        coordinator, CONFIG["api_key"], CONFIG["request_limit"], CONFIG["window_seconds"], WORKER_ID,
+        heartbeat=heartbeat
+    )
+
+    # Import PUUIDs queued by the single-worker crawler (or added since the last import)
+    imported = coordinator.enqueue_puuids(import_puuid_file())
+    if imported:
+        logging.info(f"Imported {imported} PUUIDs from the PUUID file.")
+
+    # Recover in-progress PUUIDs from this worker's journal and from workers that are gone
+    checkpoint = CrawlCheckpoint(CONFIG["checkpoint_dir"], WORKER_ID, CONFIG["checkpoint_compact_every"])
+    pending_resumes.update(checkpoint.recover(holds_live_leases=coordinator.holds_live_leases))
+    for dead_worker in checkpoint.adopted_workers:
+        coordinator.release_all(dead_worker)
+
+    logging.info(f"Worker {WORKER_ID} started.")
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
     try:
         while True:
-            puuid = get_user_puuid()
-            loop.run_until_complete(fetch_and_save_json(puuid))
+            while pending_resumes:
+                puuid, progress = pending_resumes.popitem()
+                resume_puuid(loop, puuid, progress)
+
+            # A reclaimed PUUID may have progress journaled by the worker that last held it
+            puuid = next_puuid()
+            loop.run_until_complete(fetch_and_save_json(puuid, resume=adopt_abandoned_progress(puuid)))
     except KeyboardInterrupt:
         logging.info("Interrupted by user. Exiting gracefully...")
         loop.run_until_complete(shutdown(loop))
     except Exception as e:
         logging.error(f"Error in main loop: {e}")
     finally:
+        checkpoint.close()
+        coordinator.release_all(WORKER_ID)
         loop.close()
         logging.info("Event loop closed. Exiting program...")
 
@@ -1,34 +1,22 @@
 import os
-import csv
 import requests
 import json
 import time
 import random
+from config import get_config
+from data_processing.match_index import MatchIndex
+
+CONFIG = get_config()
 
 # Define the path to your directories
-processed_csv_data_dir = 'C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data/processed_csv_data/'
+processed_csv_data_dir = CONFIG["processed_csv_dir"]
 
-# Riot API key (replace with your actual API key)
-API_KEY = 'RGAPI-f4a16e23-06c0-422e-a96c-f6ad7e1a9cb5'  # Replace with your actual API key
+# Riot API key (set api_key in the config file or RIOT_API_KEY in the environment)
+API_KEY = CONFIG["api_key"]
 
 # List of regions for Riot's API
 REGIONS = ['Americas', 'Europe', "Asia", "Esports"]
 
-# Function to read PUUIDs from the Player_Data.csv file
-def read_puuids_from_csv(csv_file):
-    puuids = []
-    try:
-        with open(csv_file, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                puuid = row.get('puuid')
-                if puuid:
-                    puuids.append(puuid)
-    except Exception as e:
-        print(f"Error reading {csv_file}: {e}")
-    return puuids
-
-
 # Fetch gameName and tagLine using Riot API from all regions
 def fetch_game_info_from_riot(puuid):
     for region in REGIONS:
@@ -73,7 +61,7 @@ def fetch_game_info_from_riot(puuid):
 
 
 # Function to save the gameName and tagLine in a JSON file
-def save_game_info_to_json(match_id, puuid, game_name, tag_line):
+def save_game_info_to_json(match_dir, puuid, game_name, tag_line):
     game_info = {
         'puuid': puuid,
         'gameName': game_name,
@@ -81,7 +69,7 @@ def save_game_info_to_json(match_id, puuid, game_name, tag_line):
     }
 
     # Path to save the JSON file
-    json_file_path = os.path.join(processed_csv_data_dir, match_id, f'{puuid}_game_info.json')
+    json_file_path = os.path.join(match_dir, f'{puuid}_game_info.json')
 
     try:
         with open(json_file_path, 'w') as json_file:
@@ -91,33 +79,30 @@ def save_game_info_to_json(match_id, puuid, game_name, tag_line):
         print(f"Error saving game info for PUUID {puuid} to {json_file_path}: {e}")
 
 
-# Function to process each match directory and get game info for PUUIDs
-def scan_and_process_directories():
-    # Scan through all match ID directories, including subdirectories in processed_csv_data_dir
-    for root, dirs, files in os.walk(processed_csv_data_dir):
-        print(f"Scanning directory: {root}")
-        print(f"Found files: {files}")
+# Function to resolve game info for every indexed PUUID and save it next to its matches
+def scan_and_process_directories(puuids=None):
+    with MatchIndex(processed_csv_data_dir) as index:
+        index.ensure_built()
+        if puuids is None:
+            puuids = index.all_puuids()
 
-        # Skip directories missing required files
-        if 'Player_Data.csv' not in files:
-            print(f"Skipping {root} as Player_Data.csv is missing.")
-            continue  # Skip to the next directory
+        # Batch lookups replace a directory walk; each player is resolved once, not once per match
+        match_dirs = index.rows_for_puuids(puuids)
+        known_names = index.names_for_puuids(puuids)
 
-        print(f"Found Player_Data.csv in {root}, processing...")
-
-        match_id = os.path.basename(root)  # Extract match ID from directory path
-        player_data_csv = os.path.join(root, 'Player_Data.csv')
-
-        # Extract PUUIDs from the CSV file
-        puuids = read_puuids_from_csv(player_data_csv)
-
-        # For each PUUID, fetch game info and save it
         for puuid in puuids:
-            game_name, tag_line = fetch_game_info_from_riot(puuid)
-            if game_name and tag_line:
-                save_game_info_to_json(match_id, puuid, game_name, tag_line)
-            else:
+            summoner_name, game_name, tag_line = known_names.get(puuid, (None, None, None))
+            if not (game_name and tag_line):
+                game_name, tag_line = fetch_game_info_from_riot(puuid)
+                if game_name and tag_line:
+                    index.set_player_names(puuid, game_name, tag_line)
+
+            if not (game_name and tag_line):
                 print(f"Failed to fetch game info for PUUID {puuid}")
+                continue
+
+            for match_id, match_dir, row_index in match_dirs[puuid]:
+                save_game_info_to_json(match_dir, puuid, game_name, tag_line)
 
 
 # Run the main function
@@ -1,8 +1,11 @@
+import asyncio
 import aiohttp
 import logging
+from config import get_config
 
-API_BASE_URL = "https://americas.api.riotgames.com/lol/match/v5/matches"
-API_KEY = "RGAPI-f4a16e23-06c0-422e-a96c-f6ad7e1a9cb5"  # Replace with your actual API key
+CONFIG = get_config()
+API_BASE_URL = CONFIG["api_base_url"]
+API_KEY = CONFIG["api_key"]  # Set api_key in the config file or RIOT_API_KEY in the environment
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
@@ -29,15 +32,27 @@ async def fetch_match_ids(puuid, start=0, count=20):
                 logging.error(f"Error fetching match IDs: {response.status}")
                 return []
 
-async def fetch_match_data(match_id):
+async def fetch_match_data_with_status(match_id):
     """
     Fetch match data for a given match ID.
+    Returns (status, data); status is None if the request never got a response.
     """
     url = f"{API_BASE_URL}/{match_id}"
-    async with aiohttp.ClientSession(headers=HEADERS) as session:
-        async with session.get(url, params={"api_key": API_KEY}) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                logging.error(f"Error fetching match data for {match_id}: {response.status}")
-                return None
+    try:
+        async with aiohttp.ClientSession(headers=HEADERS) as session:
+            async with session.get(url, params={"api_key": API_KEY}) as response:
+                if response.status == 200:
+                    return response.status, await response.json()
+                else:
+                    logging.error(f"Error fetching match data for {match_id}: {response.status}")
+                    return response.status, None
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"Connection error fetching match data for {match_id}: {e}")
+        return None, None
+
+async def fetch_match_data(match_id):
+    """
+    Fetch match data for a given match ID.
+    """
+    status, match_data = await fetch_match_data_with_status(match_id)
+    return match_data
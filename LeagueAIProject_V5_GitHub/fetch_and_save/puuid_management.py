@@ -1,32 +1,48 @@
 import os
+from config import get_config
 
-PUUID_FILE = "C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data/fetcher/fetcher/puuids.txt"
-USED_PUUID_FILE = "C:/Users/ssass/PyCharmProjects/LeagueAIProject_V4/match_id_and_data/fetcher/fetcher/used_puuids.txt"
+CONFIG = get_config()
+PUUID_FILE = CONFIG["puuid_file"]
+USED_PUUID_FILE = CONFIG["used_puuid_file"]
+
+# The PUUID file is moved here once its PUUIDs are handed to the coordinator
+IMPORTED_PUUID_FILE = PUUID_FILE + ".imported"
 
 def get_user_puuid():
     """
-    Get a PUUID to process from the PUUID file.
+    Prompt for a seed PUUID and write it to the PUUID file to be imported.
     """
-    if not os.path.exists(PUUID_FILE):
-        print(f"{PUUID_FILE} not found. Creating it now...")
-        puuid = input("Please enter a PUUID to start the process: ").strip()
-        with open(PUUID_FILE, "w") as file:
-            file.write(puuid + "\n")
-        return puuid
-
-    with open(PUUID_FILE, "r") as file:
-        lines = file.readlines()
+    print(f"{PUUID_FILE} not found. Creating it now...")
+    puuid = input("Please enter a PUUID to start the process: ").strip()
+    if not puuid:
+        raise ValueError("A PUUID is required to start the crawl.")
+    os.makedirs(os.path.dirname(PUUID_FILE), exist_ok=True)
+    with open(PUUID_FILE, "a") as file:
+        file.write(puuid + "\n")
+    return puuid
 
-    if not lines:
-        raise ValueError(f"{PUUID_FILE} is empty. Add PUUIDs to the file.")
+def puuid_file_exists():
+    """
+    True if a PUUID file was ever provided, whether or not it has been imported yet.
+    """
+    return os.path.exists(PUUID_FILE) or os.path.exists(IMPORTED_PUUID_FILE)
 
-    puuid = lines[0].strip()
+def import_puuid_file():
+    """
+    Move the PUUID file aside and return every PUUID it lists. The rename is atomic, so
+    concurrent workers never edit the file; PUUIDs added to a new PUUID file are picked up
+    on the next import. Re-reading an earlier import is harmless since queueing is idempotent.
+    """
+    try:
+        os.replace(PUUID_FILE, IMPORTED_PUUID_FILE)
+    except FileNotFoundError:
+        pass  # Nothing new, or another worker moved it first
 
-    # Remove the used PUUID
-    with open(PUUID_FILE, "w") as file:
-        file.writelines(lines[1:])
+    if not os.path.exists(IMPORTED_PUUID_FILE):
+        return []
 
-    return puuid
+    with open(IMPORTED_PUUID_FILE, "r") as file:
+        return [line.strip() for line in file if line.strip()]
 
 def log_used_puuid(puuid):
     """
@@ -34,11 +50,3 @@ def log_used_puuid(puuid):
     """
     with open(USED_PUUID_FILE, "a") as file:
         file.write(puuid + "\n")
-
-def repopulate_puuid_file(puuids):
-    """
-    Overwrite the PUUID file with a new list of PUUIDs.
-    """
-    with open(PUUID_FILE, "w") as file:
-        for puuid in puuids:
-            file.write(puuid + "\n")
@@ -0,0 +1,258 @@
+import heapq
+import json
+import logging
+import os
+import random
+import time
+
+# Error classes for failed requests
+RETRY_SOON = "retry_soon"      # Transient: network errors, gateway errors
+RETRY_LATER = "retry_later"    # Likely to last a while: other 5xx
+RATE_LIMITED = "rate_limited"  # 429: our budget, not the match's fault
+AUTH_ERROR = "auth_error"      # 401/403: the API key was rejected (e.g. an expired development key)
+PERMANENT = "permanent"        # Will never succeed: 400, 404 and other client errors
+
+RETRY_SOON_STATUSES = {500, 502, 503, 504}
+AUTH_ERROR_STATUSES = {401, 403}
+
+# Failures that say nothing about the match itself and so don't use up its attempts
+UNCHARGED_CLASSES = {RATE_LIMITED, AUTH_ERROR}
+
+# Why an ID was dead-lettered
+DEAD_PERMANENT = "permanent"  # A permanent error; never retried
+DEAD_EXHAUSTED = "exhausted"  # Ran out of attempts on transient errors; retried once the entry expires
+
+
+def classify_status(status):
+    """
+    Classify an HTTP status (None for a connection error or timeout) into
+    RETRY_SOON, RETRY_LATER, RATE_LIMITED, AUTH_ERROR or PERMANENT.
+    """
+    if status is None or status in RETRY_SOON_STATUSES:
+        return RETRY_SOON
+    if status == 429:
+        return RATE_LIMITED
+    if status in AUTH_ERROR_STATUSES:
+        return AUTH_ERROR
+    if status >= 500:
+        return RETRY_LATER
+    return PERMANENT
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown_seconds=120):
+        """
+        Initialize the CircuitBreaker with:
+        - failure_threshold: Consecutive failures that open the circuit (e.g., 5).
+        - cooldown_seconds: How long the circuit stays open before a trial request (e.g., 120 seconds).
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def allow(self, now=None):
+        """
+        Return True if a request may be sent. After the cooldown the circuit is
+        half-open: one trial request is let through and its result closes or re-opens it.
+        """
+        if self.opened_at is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self.opened_at >= self.cooldown_seconds
+
+    def remaining(self, now=None):
+        """
+        Seconds until the circuit allows a trial request.
+        """
+        if self.opened_at is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        return max(0, self.cooldown_seconds - (now - self.opened_at))
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logging.info("Circuit closed after a successful request.")
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def trip(self, now=None):
+        """
+        Open the circuit immediately, e.g. when the API key is rejected.
+        """
+        self.consecutive_failures = max(self.consecutive_failures, self.failure_threshold - 1)
+        self.record_failure(now)
+
+    def record_failure(self, now=None):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            now = time.monotonic() if now is None else now
+            if self.opened_at is None:
+                logging.warning(f"Circuit opened after {self.consecutive_failures} consecutive failures. "
+                                f"Pausing requests for {self.cooldown_seconds} seconds...")
+            self.opened_at = now
+
+
+class RetryScheduler:
+    def __init__(self, dead_letter_file, max_attempts=5, base_delays=None, max_delay=3600, exhausted_expiry=86400):
+        """
+        Initialize the RetryScheduler with:
+        - dead_letter_file: JSON-lines file recording IDs that failed permanently (e.g., 404)
+          or ran out of attempts, with the reason.
+        - max_attempts: Failed attempts before an ID is dead-lettered as exhausted (e.g., 5).
+        - base_delays: First backoff delay in seconds per error class.
+        - max_delay: Upper bound on any single backoff delay in seconds.
+        - exhausted_expiry: Seconds an exhausted ID is skipped before it may be tried again (e.g., 86400).
+        """
+        self.dead_letter_file = dead_letter_file
+        self.max_attempts = max_attempts
+        self.base_delays = base_delays or {RETRY_SOON: 5, RETRY_LATER: 300, RATE_LIMITED: 5, AUTH_ERROR: 300}
+        self.max_delay = max_delay
+        self.exhausted_expiry = exhausted_expiry
+        self.attempts = {}
+        self._queue = []  # Heap of (due_time, sequence, item_id)
+        self._sequence = 0
+        self._dead_letters = None  # Loaded on first use so importing the crawler stays side-effect free
+        self._dead_letters_mtime = None
+
+    @property
+    def dead_letters(self):
+        """
+        {item_id: expiry time, or None if it never expires}. Reloaded when the file changes,
+        so entries written by other workers sharing the file are picked up.
+        """
+        try:
+            mtime = os.path.getmtime(self.dead_letter_file)
+        except OSError:
+            mtime = None
+        if self._dead_letters is None or mtime != self._dead_letters_mtime:
+            self._dead_letters = self._load_dead_letters()
+            self._dead_letters_mtime = mtime
+        return self._dead_letters
+
+    def _expiry(self, reason, dead_at):
+        return dead_at + self.exhausted_expiry if reason == DEAD_EXHAUSTED else None
+
+    @staticmethod
+    def _merge_expiry(dead_letters, item_id, expiry):
+        # A permanent entry wins; otherwise keep the latest expiry
+        previous = dead_letters.get(item_id, expiry)
+        if expiry is None or previous is None:
+            dead_letters[item_id] = None
+        else:
+            dead_letters[item_id] = max(expiry, previous)
+
+    def _load_dead_letters(self):
+        """
+        Read dead-lettered IDs so they are skipped across restarts.
+        Entries without a reason predate exhausted entries and are permanent.
+        """
+        if not os.path.exists(self.dead_letter_file):
+            return {}
+
+        dead_letters = {}
+        with open(self.dead_letter_file, "r") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    expiry = self._expiry(record.get("reason", DEAD_PERMANENT), record.get("time", 0))
+                    self._merge_expiry(dead_letters, record["id"], expiry)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+        return dead_letters
+
+    def is_dead(self, item_id, now=None):
+        """
+        True if the ID is dead-lettered: permanently, or as exhausted and not yet expired.
+        """
+        dead_letters = self.dead_letters
+        if item_id not in dead_letters:
+            return False
+        expiry = dead_letters[item_id]
+        now = time.time() if now is None else now
+        return expiry is None or now < expiry
+
+    def is_pending(self, item_id):
+        return item_id in self.attempts
+
+    def __len__(self):
+        return len(self._queue)
+
+    def backoff_delay(self, error_class, attempt):
+        """
+        Exponential backoff with jitter for the given attempt number (1-based).
+        """
+        delay = min(self.max_delay, self.base_delays[error_class] * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def record_failure(self, item_id, status, now=None):
+        """
+        Schedule a failed ID for a later retry. Permanent errors are dead-lettered for good;
+        429 and auth errors don't use up an attempt, and an ID that exhausts its attempts
+        on other errors is dead-lettered as exhausted until the entry expires. Returns the error class.
+        """
+        error_class = classify_status(status)
+        if error_class == PERMANENT:
+            self.dead_letter(item_id, status, self.attempts.get(item_id, 0) + 1)
+            return error_class
+
+        attempt = self.attempts.get(item_id, 0)
+        if error_class not in UNCHARGED_CLASSES:
+            attempt += 1
+            if attempt >= self.max_attempts:
+                self.dead_letter(item_id, status, attempt, reason=DEAD_EXHAUSTED)
+                return error_class
+        self.attempts[item_id] = attempt
+
+        now = time.monotonic() if now is None else now
+        delay = self.backoff_delay(error_class, max(attempt, 1))
+        heapq.heappush(self._queue, (now + delay, self._sequence, item_id))
+        self._sequence += 1
+        logging.info(f"Scheduled {item_id} for retry {attempt} in {delay:.1f} seconds ({error_class}, status {status}).")
+        return error_class
+
+    def record_success(self, item_id):
+        self.attempts.pop(item_id, None)
+
+    def dead_letter(self, item_id, status, attempts, reason=DEAD_PERMANENT):
+        """
+        Append an ID to the persistent dead-letter list with the reason it was given up on.
+        """
+        self.attempts.pop(item_id, None)
+        dead_at = time.time()
+        dead_letters = self.dead_letters
+        os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_file)), exist_ok=True)
+        with open(self.dead_letter_file, "a") as file:
+            file.write(json.dumps({
+                "id": item_id, "status": status, "attempts": attempts, "reason": reason, "time": dead_at
+            }) + "\n")
+        self._merge_expiry(dead_letters, item_id, self._expiry(reason, dead_at))
+        self._dead_letters_mtime = os.path.getmtime(self.dead_letter_file)
+
+        if reason == DEAD_EXHAUSTED:
+            logging.error(f"Giving up on {item_id} after {attempts} attempts (status {status}). "
+                          f"Added to dead-letter list for {self.exhausted_expiry} seconds.")
+        else:
+            logging.error(f"Match {item_id} failed permanently (status {status}). Added to dead-letter list.")
+
+    def pop_due(self, now=None):
+        """
+        Remove and return the IDs whose retry time has come, oldest first.
+        IDs that succeeded in the meantime are dropped.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            item_id = heapq.heappop(self._queue)[2]
+            if self.is_pending(item_id):
+                due.append(item_id)
+        return due
+
+    def next_due_in(self, now=None):
+        """
+        Seconds until the next scheduled retry, or None if the queue is empty.
+        """
+        if not self._queue:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0, self._queue[0][0] - now)
@@ -0,0 +1,121 @@
+import argparse
+import json
+import sys
+
+from config import load_config, get_config
+
+
+# Each command imports its module inside the handler so pandas, aiohttp, watchdog and
+# requests are only loaded by the commands that use them.
+
+def run_crawl(args):
+    from fetch_and_save.fetch_and_save_json import main
+    main()
+
+
+def run_convert(args):
+    from data_processing.process_json_to_csv import monitor_directory
+    monitor_directory(once=args.once)
+
+
+def run_reproject(args):
+    from data_processing.process_json_to_csv import reproject_archive, PROJECTION_PROFILE
+    reproject_archive(args.profile or PROJECTION_PROFILE)
+
+
+def run_split(args):
+    from data_processing.compress_data import main
+    main(puuids=args.puuid or None)
+
+
+def run_history(args):
+    import os
+    from data_processing.compress_data import export_player_history
+    config = get_config()
+    output_path = args.output or os.path.join(config["match_data_dir"], f"{args.puuid}_history.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    export_player_history(config["processed_csv_dir"], args.puuid, output_path)
+
+
+def run_aggregate(args):
+    from data_processing.folder_synchro import main
+    main()
+
+
+def run_resolve_names(args):
+    from fetch_and_save.fetch_by_puuid import scan_and_process_directories
+    scan_and_process_directories(puuids=args.puuid or None)
+
+
+def run_coordinator(args):
+    import logging
+    from fetch_and_save.coordination import serve_coordinator
+    config = get_config()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    serve_coordinator(
+        config["coordinator_db"], config["coordinator_address"], config["coordinator_authkey"], config["lease_seconds"]
+    )
+
+
+def run_show_config(args):
+    config = get_config()
+    for secret in ("api_key", "coordinator_authkey"):
+        if config[secret]:
+            config = dict(config, **{secret: "<set>"})
+    print(json.dumps(config, indent=4))
+
+
+def build_parser():
+    """
+    Build the command line parser with one subcommand per pipeline stage.
+    """
+    parser = argparse.ArgumentParser(description="Fetch, process and organize League match data.")
+    parser.add_argument("--config", help="JSON settings file (defaults to $LEAGUE_AI_CONFIG)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl = subparsers.add_parser("crawl", help="Fetch match JSON for queued PUUIDs")
+    crawl.set_defaults(handler=run_crawl)
+
+    convert = subparsers.add_parser("convert", help="Convert raw match JSON into CSV files")
+    convert.add_argument("--once", action="store_true", help="Process existing files and exit instead of watching")
+    convert.set_defaults(handler=run_convert)
+
+    reproject = subparsers.add_parser("reproject", help="Rebuild CSVs from the raw archive with a projection profile")
+    reproject.add_argument("--profile", help="Profile to apply (defaults to projection_profile)")
+    reproject.set_defaults(handler=run_reproject)
+
+    split = subparsers.add_parser("split", help="Split processed CSVs into per-player match files")
+    split.add_argument("--puuid", action="append", help="Only export this PUUID (repeatable)")
+    split.set_defaults(handler=run_split)
+
+    history = subparsers.add_parser("history", help="Export one player's indexed match history to a single CSV")
+    history.add_argument("--puuid", required=True, help="Player to export")
+    history.add_argument("--output", help="CSV file to write (defaults to <match_data_dir>/<puuid>_history.csv)")
+    history.set_defaults(handler=run_history)
+
+    aggregate = subparsers.add_parser("aggregate", help="Build the aggregated and AI-ready datasets")
+    aggregate.set_defaults(handler=run_aggregate)
+
+    resolve_names = subparsers.add_parser("resolve-names", help="Look up Riot IDs for indexed PUUIDs")
+    resolve_names.add_argument("--puuid", action="append", help="Only resolve this PUUID (repeatable)")
+    resolve_names.set_defaults(handler=run_resolve_names)
+
+    coordinator = subparsers.add_parser("coordinator", help="Serve the crawl coordinator to workers on other machines")
+    coordinator.set_defaults(handler=run_coordinator)
+
+    show_config = subparsers.add_parser("show-config", help="Print the resolved settings")
+    show_config.set_defaults(handler=run_show_config)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Settings must be loaded before any pipeline module reads them at import
+    load_config(args.config)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())